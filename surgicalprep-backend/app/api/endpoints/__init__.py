@@ -1,6 +1,6 @@
 """
 API endpoint routers for SurgicalPrep.
 """
-from app.api.endpoints import auth, users, instruments, cards, quiz
+from app.api.endpoints import auth, users, instruments, cards, quiz, progress
 
-__all__ = ["auth", "users", "instruments", "cards", "quiz"]
+__all__ = ["auth", "users", "instruments", "cards", "quiz", "progress"]
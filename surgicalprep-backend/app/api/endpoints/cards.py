@@ -1,13 +1,15 @@
 """
 Preference Cards endpoints: CRUD, templates, duplication.
 """
+import hashlib
+import uuid
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select, func, or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import String, and_, func, insert, literal, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import get_db
-from app.db.models import User, PreferenceCard
+from app.db.models import User, PreferenceCard, generate_uuid, utc_now
 from app.core.security import get_current_user_id
 from app.core.config import settings
 from app.schemas.card import (
@@ -17,40 +19,76 @@ from app.schemas.card import (
     PreferenceCardListItem,
     PaginatedCards,
     DuplicateCardRequest,
+    ReorderItemsRequest,
 )
 
 router = APIRouter()
 
 
-async def check_card_limit(db: AsyncSession, user_id: str) -> None:
-    """Check if user has reached their card limit."""
-    # Get user tier
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    if user.subscription_tier == "premium":
-        return  # No limit for premium
-    
-    # Count existing cards
-    count_result = await db.execute(
-        select(func.count(PreferenceCard.id))
-        .where(PreferenceCard.user_id == user_id)
-        .where(PreferenceCard.is_template == False)
+def compute_etag(*parts) -> str:
+    """Build a quoted ETag from the values that determine a response body."""
+    digest = hashlib.blake2b(
+        "-".join(str(p) for p in parts).encode(), digest_size=8
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match header covers the given ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]
+
+
+def valid_card_id(card_id: str) -> str:
+    """Reject malformed card IDs with a 404 before any database work."""
+    try:
+        return str(uuid.UUID(card_id))
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Card not found")
+
+
+async def reserve_card_slot(db: AsyncSession, user_id: str) -> None:
+    """Claim one card slot for the user, failing if the free tier is full."""
+    # A single conditional UPDATE both checks and bumps the counter, so two
+    # concurrent creates cannot both see room for one more card.
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .where(or_(
+            User.subscription_tier == "premium",
+            User.cards_used < settings.FREE_TIER_CARDS_LIMIT,
+        ))
+        .values(cards_used=User.cards_used + 1)
+        .returning(User.cards_used)
     )
-    card_count = count_result.scalar() or 0
     
-    if card_count >= settings.FREE_TIER_CARDS_LIMIT:
+    if result.scalar_one_or_none() is None:
+        user_result = await db.execute(select(User.id).where(User.id == user_id))
+        if user_result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"Free tier limit reached ({settings.FREE_TIER_CARDS_LIMIT} cards). Upgrade to premium for unlimited cards.",
         )
 
 
+async def release_card_slot(db: AsyncSession, user_id: str) -> None:
+    """Give back a card slot after one of the user's cards is deleted."""
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .where(User.cards_used > 0)
+        .values(cards_used=User.cards_used - 1)
+    )
+
+
 @router.get("", response_model=PaginatedCards)
 async def list_cards(
+    request: Request,
+    response: Response,
     query: Optional[str] = Query(None),
     specialty: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
@@ -60,7 +98,11 @@ async def list_cards(
 ):
     """List user's preference cards."""
     stmt = select(PreferenceCard).where(PreferenceCard.user_id == user_id)
-    count_stmt = select(func.count(PreferenceCard.id)).where(PreferenceCard.user_id == user_id)
+    # Total and latest update in one query; together they version the list
+    count_stmt = (
+        select(func.count(PreferenceCard.id), func.max(PreferenceCard.updated_at))
+        .where(PreferenceCard.user_id == user_id)
+    )
     
     # Apply search
     if query:
@@ -79,7 +121,14 @@ async def list_cards(
     
     # Get total
     total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
+    total, last_updated = total_result.one()
+    total = total or 0
+    
+    # Skip loading and serializing the page if the client's copy is current
+    etag = compute_etag(user_id, total, last_updated, query, specialty, page, page_size)
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     
     # Paginate
     offset = (page - 1) * page_size
@@ -137,7 +186,9 @@ async def list_templates(db: AsyncSession = Depends(get_db)):
 
 @router.get("/{card_id}", response_model=PreferenceCardResponse)
 async def get_card(
-    card_id: str,
+    request: Request,
+    response: Response,
+    card_id: str = Depends(valid_card_id),
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ):
@@ -154,6 +205,11 @@ async def get_card(
     if card.user_id != user_id and not (card.is_template and card.is_public):
         raise HTTPException(status_code=403, detail="Access denied")
     
+    etag = compute_etag(card.id, card.updated_at.isoformat())
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
     return card
 
 
@@ -164,7 +220,7 @@ async def create_card(
     user_id: str = Depends(get_current_user_id),
 ):
     """Create a new preference card."""
-    await check_card_limit(db, user_id)
+    await reserve_card_slot(db, user_id)
     
     card = PreferenceCard(
         user_id=user_id,
@@ -186,8 +242,8 @@ async def create_card(
 
 @router.patch("/{card_id}", response_model=PreferenceCardResponse)
 async def update_card(
-    card_id: str,
     data: PreferenceCardUpdate,
+    card_id: str = Depends(valid_card_id),
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ):
@@ -218,7 +274,7 @@ async def update_card(
 
 @router.delete("/{card_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_card(
-    card_id: str,
+    card_id: str = Depends(valid_card_id),
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ):
@@ -234,48 +290,121 @@ async def delete_card(
         raise HTTPException(status_code=404, detail="Card not found")
     
     await db.delete(card)
+    # Templates never take a slot (see reserve_card_slot and the quota backfill)
+    if not card.is_template:
+        await release_card_slot(db, user_id)
     await db.flush()
 
 
-@router.post("/{card_id}/duplicate", response_model=PreferenceCardResponse)
+@router.post("/{card_id}/duplicate", response_model=PreferenceCardResponse, status_code=status.HTTP_201_CREATED)
 async def duplicate_card(
-    card_id: str,
     data: DuplicateCardRequest,
+    card_id: str = Depends(valid_card_id),
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user_id),
 ):
     """Duplicate a preference card."""
-    await check_card_limit(db, user_id)
+    await reserve_card_slot(db, user_id)
+    
+    # Copy the row server-side in a single INSERT ... SELECT, so the source
+    # card and its items never have to be loaded into Python.
+    now = utc_now()
+    new_title = (
+        literal(data.new_title, String) if data.new_title
+        else PreferenceCard.title + " (Copy)"
+    )
+    source = (
+        select(
+            literal(generate_uuid(), PreferenceCard.id.type),
+            literal(user_id, PreferenceCard.user_id.type),
+            new_title,
+            PreferenceCard.surgeon_name,
+            PreferenceCard.procedure_name,
+            PreferenceCard.specialty,
+            PreferenceCard.general_notes,
+            PreferenceCard.setup_notes,
+            PreferenceCard.items,
+            PreferenceCard.photo_urls,
+            literal(False),
+            literal(False),
+            literal(now, PreferenceCard.created_at.type),
+            literal(now, PreferenceCard.updated_at.type),
+        )
+        .where(PreferenceCard.id == card_id)
+        .where(or_(
+            PreferenceCard.user_id == user_id,
+            and_(PreferenceCard.is_template == True, PreferenceCard.is_public == True),
+        ))
+    )
+    stmt = (
+        insert(PreferenceCard)
+        .from_select(
+            [
+                "id", "user_id", "title", "surgeon_name", "procedure_name",
+                "specialty", "general_notes", "setup_notes", "items",
+                "photo_urls", "is_template", "is_public", "created_at", "updated_at",
+            ],
+            source,
+        )
+        .returning(PreferenceCard)
+    )
+    result = await db.execute(stmt)
+    new_card = result.scalar_one_or_none()
+    
+    if not new_card:
+        # Nothing copied, so hand back the slot claimed above before failing;
+        # the request may not be rolled back around the error response
+        await release_card_slot(db, user_id)
+        
+        # Work out whether the card is missing or not ours
+        exists = await db.execute(
+            select(PreferenceCard.id).where(PreferenceCard.id == card_id)
+        )
+        if exists.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Card not found")
+        raise HTTPException(status_code=403, detail="Access denied")
     
-    # Get original card
+    return new_card
+
+
+@router.put("/{card_id}/items/reorder", response_model=PreferenceCardResponse)
+async def reorder_items(
+    data: ReorderItemsRequest,
+    card_id: str = Depends(valid_card_id),
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Reorder the items on a preference card."""
+    # Only the items column is needed to build the new order
     result = await db.execute(
-        select(PreferenceCard).where(PreferenceCard.id == card_id)
+        select(PreferenceCard.items)
+        .where(PreferenceCard.id == card_id)
+        .where(PreferenceCard.user_id == user_id)
     )
-    original = result.scalar_one_or_none()
+    items = result.scalar_one_or_none()
     
-    if not original:
+    if items is None:
         raise HTTPException(status_code=404, detail="Card not found")
     
-    # Check access
-    if original.user_id != user_id and not (original.is_template and original.is_public):
-        raise HTTPException(status_code=403, detail="Access denied")
+    items_by_id = {item["id"]: item for item in items}
+    if len(data.item_ids) != len(items_by_id) or set(data.item_ids) != set(items_by_id):
+        raise HTTPException(
+            status_code=400,
+            detail="item_ids must list every item on the card exactly once",
+        )
     
-    # Create copy
-    new_title = data.new_title if data.new_title else f"{original.title} (Copy)"
+    reordered = [
+        {**items_by_id[item_id], "sort_order": position}
+        for position, item_id in enumerate(data.item_ids)
+    ]
     
-    new_card = PreferenceCard(
-        user_id=user_id,
-        title=new_title,
-        surgeon_name=original.surgeon_name,
-        procedure_name=original.procedure_name,
-        specialty=original.specialty,
-        general_notes=original.general_notes,
-        setup_notes=original.setup_notes,
-        items=original.items,
-        photo_urls=original.photo_urls,
+    # Write every position back in one UPDATE, whatever the item count
+    result = await db.execute(
+        update(PreferenceCard)
+        .where(PreferenceCard.id == card_id)
+        .where(PreferenceCard.user_id == user_id)
+        .values(items=reordered, updated_at=utc_now())
+        .returning(PreferenceCard)
     )
-    db.add(new_card)
-    await db.flush()
-    await db.refresh(new_card)
     
-    return new_card
+    return result.scalar_one()
@@ -0,0 +1,164 @@
+"""
+Study progress endpoints: per-instrument SM-2 state and study results.
+"""
+import uuid
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_db
+from app.db.models import Instrument, UserInstrumentProgress
+from app.core.security import get_current_user_id
+from app.services.spaced_repetition import get_or_create_progress, apply_study_result, apply_study_results
+from app.schemas.quiz import StudyAttempt, BulkStudyAttempts, InstrumentStudyState, ResetProgressRequest
+
+router = APIRouter()
+
+# Column values for a progress row with no study history (bookmarks are kept)
+RESET_PROGRESS_STATE = {
+    "times_studied": 0,
+    "times_correct": 0,
+    "repetitions": 0,
+    "interval_days": 1,
+    "ease_factor": 2.5,
+    "last_studied_at": None,
+    "next_review_at": None,
+}
+
+
+def valid_instrument_id(instrument_id: str) -> str:
+    """Reject malformed instrument IDs with a 404 before any database work."""
+    try:
+        return str(uuid.UUID(instrument_id))
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Instrument not found")
+
+
+def to_study_state(progress: UserInstrumentProgress) -> InstrumentStudyState:
+    """Serialize a progress row into the API's study-state shape."""
+    return InstrumentStudyState(
+        instrument_id=progress.instrument_id,
+        times_studied=progress.times_studied,
+        times_correct=progress.times_correct,
+        ease_factor=progress.ease_factor,
+        interval=progress.interval_days,
+        repetitions=progress.repetitions,
+        next_review=progress.next_review_at,
+        last_studied=progress.last_studied_at,
+        is_bookmarked=progress.is_bookmarked,
+    )
+
+
+async def load_instrument_progress(
+    db: AsyncSession, user_id: str, instrument_id: str
+) -> UserInstrumentProgress:
+    """Get the user's progress row for an existing instrument."""
+    instrument = await db.get(Instrument, instrument_id)
+    if not instrument:
+        raise HTTPException(status_code=404, detail="Instrument not found")
+    
+    return await get_or_create_progress(db, user_id, instrument_id)
+
+
+async def find_progress(db: AsyncSession, user_id: str, instrument_id: str) -> UserInstrumentProgress:
+    """Get the user's existing progress row for an instrument or raise 404."""
+    result = await db.execute(
+        select(UserInstrumentProgress)
+        .where(UserInstrumentProgress.user_id == user_id)
+        .where(UserInstrumentProgress.instrument_id == instrument_id)
+    )
+    progress = result.scalar_one_or_none()
+    
+    if not progress:
+        raise HTTPException(status_code=404, detail="Progress not found")
+    
+    return progress
+
+
+@router.get("/instruments/{instrument_id}", response_model=InstrumentStudyState)
+async def get_instrument_progress(
+    instrument_id: str = Depends(valid_instrument_id),
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Get the user's study progress for an instrument."""
+    progress = await find_progress(db, user_id, instrument_id)
+    return to_study_state(progress)
+
+
+@router.delete("/instruments/{instrument_id}", response_model=InstrumentStudyState)
+async def reset_instrument_progress(
+    instrument_id: str = Depends(valid_instrument_id),
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Reset the user's study progress for an instrument, keeping its bookmark."""
+    progress = await find_progress(db, user_id, instrument_id)
+    
+    for field, value in RESET_PROGRESS_STATE.items():
+        setattr(progress, field, value)
+    await db.flush()
+    
+    # Return the reset row so callers don't need a follow-up GET
+    return to_study_state(progress)
+
+
+@router.post("/instruments/{instrument_id}/study", response_model=InstrumentStudyState)
+async def record_study_result(
+    data: StudyAttempt,
+    instrument_id: str = Depends(valid_instrument_id),
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Record a single study result for an instrument."""
+    progress = await load_instrument_progress(db, user_id, instrument_id)
+    apply_study_result(progress, data.correct, datetime.now(timezone.utc))
+    await db.flush()
+    
+    return to_study_state(progress)
+
+
+@router.post("/instruments/{instrument_id}/study/bulk", response_model=InstrumentStudyState)
+async def record_study_results(
+    data: BulkStudyAttempts,
+    instrument_id: str = Depends(valid_instrument_id),
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Record a run of study results for an instrument in order."""
+    progress = await load_instrument_progress(db, user_id, instrument_id)
+    
+    # Fold every SM-2 step over the loaded row so the whole run costs one
+    # read and one UPDATE instead of a round trip per result
+    apply_study_results(progress, [attempt.correct for attempt in data.results], datetime.now(timezone.utc))
+    await db.flush()
+    
+    return to_study_state(progress)
+
+
+@router.delete("/reset-all")
+async def reset_all_progress(
+    data: ResetProgressRequest,
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Reset all of the user's study progress, keeping bookmarks."""
+    if not data.confirm:
+        raise HTTPException(status_code=400, detail="Confirmation required to reset all progress")
+    
+    # Plain DELETE/UPDATE rather than TRUNCATE, so both stay inside the
+    # request's transaction and roll back with it
+    deleted = await db.execute(
+        delete(UserInstrumentProgress)
+        .where(UserInstrumentProgress.user_id == user_id)
+        .where(UserInstrumentProgress.is_bookmarked.is_(False))
+    )
+    reset = await db.execute(
+        update(UserInstrumentProgress)
+        .where(UserInstrumentProgress.user_id == user_id)
+        .values(**RESET_PROGRESS_STATE)
+    )
+    await db.flush()
+    
+    return {"status": "reset", "deleted": deleted.rowcount, "reset": reset.rowcount}
@@ -3,7 +3,7 @@ Quiz & Study endpoints: sessions, flashcards, progress tracking.
 """
 import random
 import uuid
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select, func
@@ -13,6 +13,7 @@ from app.db.database import get_db
 from app.db.models import User, Instrument, QuizSession, UserInstrumentProgress
 from app.core.security import get_current_user_id
 from app.core.config import settings
+from app.services.spaced_repetition import get_or_create_progress, apply_study_result
 from app.schemas.quiz import (
     QuizConfig,
     QuizQuestion,
@@ -115,7 +116,7 @@ async def generate_questions(
     return questions
 
 
-@router.post("/start", response_model=QuizSessionStart)
+@router.post("/start", response_model=QuizSessionStart, status_code=status.HTTP_201_CREATED)
 async def start_quiz(
     config: QuizConfig,
     db: AsyncSession = Depends(get_db),
@@ -179,15 +180,17 @@ async def submit_answer(
     # Check answer
     is_correct = data.answer.lower().strip() == question["correct_answer"].lower().strip()
     
-    # Record answer
-    answers = session.answers or []
-    answers.append({
-        "question_id": data.question_id,
-        "answer": data.answer,
-        "is_correct": is_correct,
-        "time_taken": data.time_taken_seconds,
-    })
-    session.answers = answers
+    # Record answer. Assign a new list: appending to the loaded one in place
+    # leaves the JSON column looking unchanged, so no UPDATE would be issued
+    session.answers = [
+        *(session.answers or []),
+        {
+            "question_id": data.question_id,
+            "answer": data.answer,
+            "is_correct": is_correct,
+            "time_taken": data.time_taken_seconds,
+        },
+    ]
     
     # Update instrument progress
     await update_progress(db, user_id, question["instrument_id"], is_correct)
@@ -204,42 +207,8 @@ async def submit_answer(
 
 async def update_progress(db: AsyncSession, user_id: str, instrument_id: str, is_correct: bool):
     """Update user's progress for an instrument using SM-2 algorithm."""
-    result = await db.execute(
-        select(UserInstrumentProgress)
-        .where(UserInstrumentProgress.user_id == user_id)
-        .where(UserInstrumentProgress.instrument_id == instrument_id)
-    )
-    progress = result.scalar_one_or_none()
-    
-    if not progress:
-        progress = UserInstrumentProgress(
-            user_id=user_id,
-            instrument_id=instrument_id,
-        )
-        db.add(progress)
-    
-    progress.times_studied += 1
-    progress.last_studied_at = datetime.now(timezone.utc)
-    
-    if is_correct:
-        progress.times_correct += 1
-        progress.repetitions += 1
-        
-        # SM-2 algorithm
-        if progress.repetitions == 1:
-            progress.interval_days = 1
-        elif progress.repetitions == 2:
-            progress.interval_days = 6
-        else:
-            progress.interval_days = int(progress.interval_days * progress.ease_factor)
-        
-        progress.ease_factor = max(1.3, progress.ease_factor + 0.1)
-    else:
-        progress.repetitions = 0
-        progress.interval_days = 1
-        progress.ease_factor = max(1.3, progress.ease_factor - 0.2)
-    
-    progress.next_review_at = datetime.now(timezone.utc) + timedelta(days=progress.interval_days)
+    progress = await get_or_create_progress(db, user_id, instrument_id)
+    apply_study_result(progress, is_correct, datetime.now(timezone.utc))
 
 
 @router.post("/{session_id}/complete", response_model=QuizSessionComplete)
@@ -259,6 +228,9 @@ async def complete_quiz(
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    if session.status != "in_progress":
+        raise HTTPException(status_code=400, detail="Session is not active")
+    
     # Calculate results
     answers = session.answers or []
     correct_count = sum(1 for a in answers if a.get("is_correct"))
@@ -7,7 +7,7 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import get_db
-from app.db.models import User, PreferenceCard, QuizSession
+from app.db.models import User, QuizSession
 from app.core.security import get_current_user_id, verify_password, get_password_hash
 from app.core.config import settings
 from app.schemas.user import UserResponse, UserUpdate, PasswordChange, SubscriptionStatus
@@ -86,13 +86,6 @@ async def get_subscription_status(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Count cards
-    cards_result = await db.execute(
-        select(func.count(PreferenceCard.id))
-        .where(PreferenceCard.user_id == user_id)
-    )
-    cards_count = cards_result.scalar() or 0
-    
     # Count today's quizzes
     today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
     quizzes_result = await db.execute(
@@ -113,7 +106,7 @@ async def get_subscription_status(
         tier=user.subscription_tier,
         expires_at=user.subscription_expires_at,
         is_active=is_active or user.subscription_tier == "free",
-        cards_used=cards_count,
+        cards_used=user.cards_used,
         cards_limit=-1 if is_active else settings.FREE_TIER_CARDS_LIMIT,
         quizzes_today=quizzes_today,
         quizzes_limit=-1 if is_active else settings.FREE_TIER_DAILY_QUIZZES,
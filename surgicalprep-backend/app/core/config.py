@@ -13,6 +13,8 @@ class Settings(BaseSettings):
 
     # Database (Railway PostgreSQL)
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
 
     # Authentication
     SECRET_KEY: str
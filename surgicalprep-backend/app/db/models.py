@@ -1,30 +1,49 @@
 """
 SQLAlchemy async ORM models for SurgicalPrep.
 """
+import os
+import time
 import uuid
 from datetime import datetime, timezone
 from typing import List, Optional
 from sqlalchemy import (
-    String, Text, Boolean, Integer, Float, DateTime, ForeignKey, JSON, Index
+    String, Text, Boolean, Integer, Float, DateTime, ForeignKey, JSON, Index, CheckConstraint, Uuid
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from app.db.database import Base
 
 
+# Native UUID and text[] on PostgreSQL; the generic Uuid type and a JSON
+# fallback let the same schema build on the SQLite test database
+StringArray = ARRAY(String).with_variant(JSON(), "sqlite")
+
+
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
 def generate_uuid() -> str:
-    return str(uuid.uuid4())
+    # UUIDv7 (RFC 9562): a 48-bit millisecond timestamp ahead of 74 random
+    # bits, so new keys land at the right edge of the primary key B-tree
+    # instead of splitting pages at random positions like uuid4.
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76                      # version
+        | (rand >> 62 & 0xFFF) << 64     # rand_a
+        | 0b10 << 62                     # variant
+        | rand & ((1 << 62) - 1)         # rand_b
+    )
+    return str(uuid.UUID(int=value))
 
 
 class User(Base):
     __tablename__ = "users"
     
-    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=generate_uuid)
+    id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True, default=generate_uuid)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
     full_name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -36,6 +55,9 @@ class User(Base):
     subscription_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     stripe_customer_id: Mapped[Optional[str]] = mapped_column(String(100))
     
+    # Usage counters (kept in step with preference_cards by the cards endpoints)
+    cards_used: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, onupdate=utc_now)
@@ -44,18 +66,22 @@ class User(Base):
     preference_cards: Mapped[List["PreferenceCard"]] = relationship(back_populates="user", cascade="all, delete-orphan")
     quiz_sessions: Mapped[List["QuizSession"]] = relationship(back_populates="user", cascade="all, delete-orphan")
     instrument_progress: Mapped[List["UserInstrumentProgress"]] = relationship(back_populates="user", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        CheckConstraint("cards_used >= 0", name="check_cards_used_non_negative"),
+    )
 
 
 class Instrument(Base):
     __tablename__ = "instruments"
     
-    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=generate_uuid)
+    id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True, default=generate_uuid)
     name: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
-    aliases: Mapped[Optional[List[str]]] = mapped_column(ARRAY(String))
+    aliases: Mapped[Optional[List[str]]] = mapped_column(StringArray)
     category: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
     description: Mapped[Optional[str]] = mapped_column(Text)
-    primary_uses: Mapped[Optional[List[str]]] = mapped_column(ARRAY(String))
-    common_procedures: Mapped[Optional[List[str]]] = mapped_column(ARRAY(String))
+    primary_uses: Mapped[Optional[List[str]]] = mapped_column(StringArray)
+    common_procedures: Mapped[Optional[List[str]]] = mapped_column(StringArray)
     handling_notes: Mapped[Optional[str]] = mapped_column(Text)
     image_url: Mapped[Optional[str]] = mapped_column(String(500))
     thumbnail_url: Mapped[Optional[str]] = mapped_column(String(500))
@@ -76,8 +102,8 @@ class Instrument(Base):
 class PreferenceCard(Base):
     __tablename__ = "preference_cards"
     
-    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=generate_uuid)
-    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True, default=generate_uuid)
+    user_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Card info
     title: Mapped[str] = mapped_column(String(200), nullable=False)
@@ -93,7 +119,7 @@ class PreferenceCard(Base):
     items: Mapped[Optional[dict]] = mapped_column(JSON, default=list)
     
     # Photos (array of URLs)
-    photo_urls: Mapped[Optional[List[str]]] = mapped_column(ARRAY(String))
+    photo_urls: Mapped[Optional[List[str]]] = mapped_column(StringArray)
     
     # Flags
     is_template: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -110,9 +136,9 @@ class PreferenceCard(Base):
 class UserInstrumentProgress(Base):
     __tablename__ = "user_instrument_progress"
     
-    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=generate_uuid)
-    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    instrument_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("instruments.id", ondelete="CASCADE"), nullable=False)
+    id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True, default=generate_uuid)
+    user_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    instrument_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("instruments.id", ondelete="CASCADE"), nullable=False)
     
     # Spaced repetition (SM-2 algorithm)
     ease_factor: Mapped[float] = mapped_column(Float, default=2.5)
@@ -139,8 +165,8 @@ class UserInstrumentProgress(Base):
 class QuizSession(Base):
     __tablename__ = "quiz_sessions"
     
-    id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=generate_uuid)
-    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True, default=generate_uuid)
+    user_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Session config
     quiz_type: Mapped[str] = mapped_column(String(50), nullable=False)  # 'flashcard', 'multiple_choice'
@@ -4,8 +4,9 @@ SurgicalPrep API - Main Application Entry Point
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-from app.api.endpoints import auth, instruments, cards, quiz, users, storage
+from app.api.endpoints import auth, instruments, cards, quiz, progress, users, storage
 from app.core.config import settings
 from app.db.database import engine, Base
 # Import all models to ensure they are registered with Base.metadata
@@ -27,6 +28,7 @@ app = FastAPI(
     description="API for surgical instrument study and preference card management",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # orjson encodes much faster than stdlib json
 )
 
 # CORS Configuration - Allow Cloudflare Pages preview deployments
@@ -50,6 +52,7 @@ app.include_router(users.router, prefix="/api/users", tags=["Users"])
 app.include_router(instruments.router, prefix="/api/instruments", tags=["Instruments"])
 app.include_router(cards.router, prefix="/api/cards", tags=["Preference Cards"])
 app.include_router(quiz.router, prefix="/api/quiz", tags=["Quiz & Study"])
+app.include_router(progress.router, prefix="/api/progress", tags=["Quiz & Study"])
 app.include_router(storage.router, prefix="/api/storage", tags=["Storage"])
 
 
@@ -28,6 +28,7 @@ from app.schemas.card import (
     PreferenceCardListItem,
     PaginatedCards,
     DuplicateCardRequest,
+    ReorderItemsRequest,
 )
 from app.schemas.quiz import (
     QuizConfig,
@@ -41,6 +42,10 @@ from app.schemas.quiz import (
     StudyStats,
     FlashcardResult,
     BookmarkUpdate,
+    StudyAttempt,
+    BulkStudyAttempts,
+    InstrumentStudyState,
+    ResetProgressRequest,
 )
 
 __all__ = [
@@ -69,6 +74,7 @@ __all__ = [
     "PreferenceCardListItem",
     "PaginatedCards",
     "DuplicateCardRequest",
+    "ReorderItemsRequest",
     # Quiz
     "QuizConfig",
     "QuizQuestion",
@@ -81,4 +87,8 @@ __all__ = [
     "StudyStats",
     "FlashcardResult",
     "BookmarkUpdate",
+    "StudyAttempt",
+    "BulkStudyAttempts",
+    "InstrumentStudyState",
+    "ResetProgressRequest",
 ]
@@ -81,3 +81,8 @@ class PaginatedCards(BaseModel):
 # Duplicate request
 class DuplicateCardRequest(BaseModel):
     new_title: Optional[str] = None  # If not provided, appends "(Copy)"
+
+
+# Reorder request
+class ReorderItemsRequest(BaseModel):
+    item_ids: List[str] = Field(..., min_length=1)  # Item IDs in their new order
@@ -92,3 +92,28 @@ class FlashcardResult(BaseModel):
 class BookmarkUpdate(BaseModel):
     instrument_id: str
     is_bookmarked: bool
+
+
+class StudyAttempt(BaseModel):
+    correct: bool
+    response_time_ms: Optional[int] = Field(default=None, ge=0)
+
+
+class BulkStudyAttempts(BaseModel):
+    results: List[StudyAttempt] = Field(..., min_length=1, max_length=100)
+
+
+class InstrumentStudyState(BaseModel):
+    instrument_id: str
+    times_studied: int
+    times_correct: int
+    ease_factor: float
+    interval: int
+    repetitions: int
+    next_review: Optional[datetime] = None
+    last_studied: Optional[datetime] = None
+    is_bookmarked: bool
+
+
+class ResetProgressRequest(BaseModel):
+    confirm: bool
@@ -0,0 +1,84 @@
+"""
+SM-2 spaced repetition scheduling and per-instrument progress updates.
+"""
+from datetime import datetime, timedelta
+from functools import lru_cache
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import UserInstrumentProgress
+
+# Ease is kept in thousandths so steps add exactly and cache keys stay bounded
+MIN_EASE_X1000 = 1300
+CORRECT_EASE_BONUS_X1000 = 100
+INCORRECT_EASE_PENALTY_X1000 = 200
+
+
+@lru_cache(maxsize=4096)
+def sm2_step(is_correct: bool, repetitions: int, interval_days: int, ease_x1000: int) -> tuple[int, int, int]:
+    """
+    Apply one SM-2 review to a schedule.
+    
+    Returns:
+        Tuple of (repetitions, interval_days, ease_x1000)
+    """
+    if not is_correct:
+        return 0, 1, max(MIN_EASE_X1000, ease_x1000 - INCORRECT_EASE_PENALTY_X1000)
+    
+    repetitions += 1
+    if repetitions == 1:
+        interval_days = 1
+    elif repetitions == 2:
+        interval_days = 6
+    else:
+        interval_days = interval_days * ease_x1000 // 1000
+    
+    return repetitions, interval_days, max(MIN_EASE_X1000, ease_x1000 + CORRECT_EASE_BONUS_X1000)
+
+
+async def get_or_create_progress(db: AsyncSession, user_id: str, instrument_id: str) -> UserInstrumentProgress:
+    """Load the user's progress row for an instrument, creating it if missing."""
+    result = await db.execute(
+        select(UserInstrumentProgress)
+        .where(UserInstrumentProgress.user_id == user_id)
+        .where(UserInstrumentProgress.instrument_id == instrument_id)
+    )
+    progress = result.scalar_one_or_none()
+    
+    if not progress:
+        progress = UserInstrumentProgress(
+            user_id=user_id,
+            instrument_id=instrument_id,
+            ease_factor=2.5,
+            interval_days=1,
+            repetitions=0,
+            times_studied=0,
+            times_correct=0,
+            is_bookmarked=False,
+        )
+        db.add(progress)
+    
+    return progress
+
+
+def apply_study_results(progress: UserInstrumentProgress, results: list[bool], now: datetime) -> None:
+    """Fold a run of study results into a progress row in order."""
+    # SM-2 steps depend on each other, so they run in sequence, but on
+    # local values; the ORM row is only written once at the end
+    repetitions, interval_days = progress.repetitions, progress.interval_days
+    ease_x1000 = round(progress.ease_factor * 1000)
+    for is_correct in results:
+        repetitions, interval_days, ease_x1000 = sm2_step(is_correct, repetitions, interval_days, ease_x1000)
+    
+    progress.times_studied += len(results)
+    progress.times_correct += sum(results)
+    progress.repetitions = repetitions
+    progress.interval_days = interval_days
+    progress.ease_factor = ease_x1000 / 1000
+    progress.last_studied_at = now
+    progress.next_review_at = now + timedelta(days=interval_days)
+
+
+def apply_study_result(progress: UserInstrumentProgress, is_correct: bool, now: datetime) -> None:
+    """Apply one SM-2 step to an in-memory progress row."""
+    apply_study_results(progress, [is_correct], now)
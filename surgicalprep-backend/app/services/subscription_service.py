@@ -4,7 +4,6 @@ Subscription service handling Stripe integration and business logic.
 import stripe
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple
-from uuid import UUID
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -140,7 +139,7 @@ class SubscriptionService:
         
         # Get user
         result = await self.db.execute(
-            select(User).where(User.id == UUID(user_id))
+            select(User).where(User.id == user_id)
         )
         user = result.scalar_one_or_none()
         if not user:
@@ -175,7 +174,7 @@ class SubscriptionService:
             user = result.scalar_one_or_none()
         else:
             result = await self.db.execute(
-                select(User).where(User.id == UUID(user_id))
+                select(User).where(User.id == user_id)
             )
             user = result.scalar_one_or_none()
         
@@ -72,6 +72,7 @@ CREATE TABLE users (
     subscription_expires_at TIMESTAMPTZ,
     stripe_customer_id VARCHAR(255),
     stripe_subscription_id VARCHAR(255),
+    cards_used INTEGER NOT NULL DEFAULT 0 CHECK (cards_used >= 0),
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
@@ -0,0 +1,52 @@
+-- ============================================================================
+-- Migration: Add Card Quota Counter
+-- Description: Adds a per-user cards_used counter so the free-tier card limit
+--              can be enforced with one atomic UPDATE instead of COUNT(*).
+-- ============================================================================
+
+-- ============================================================================
+-- Step 1: Add counter column to users table
+-- ============================================================================
+
+ALTER TABLE users 
+ADD COLUMN IF NOT EXISTS cards_used INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE users 
+DROP CONSTRAINT IF EXISTS check_cards_used_non_negative;
+
+ALTER TABLE users 
+ADD CONSTRAINT check_cards_used_non_negative 
+CHECK (cards_used >= 0);
+
+-- ============================================================================
+-- Step 2: Backfill from existing cards
+-- ============================================================================
+
+UPDATE users u
+SET cards_used = (
+    SELECT COUNT(*)
+    FROM preference_cards c
+    WHERE c.user_id = u.id
+    AND c.is_template = FALSE
+);
+
+-- ============================================================================
+-- Rollback Script (if needed)
+-- ============================================================================
+/*
+-- To rollback this migration:
+
+ALTER TABLE users DROP CONSTRAINT IF EXISTS check_cards_used_non_negative;
+ALTER TABLE users DROP COLUMN IF EXISTS cards_used;
+*/
+
+-- ============================================================================
+-- Verification
+-- ============================================================================
+
+-- Counters should match the actual card counts
+SELECT u.id, u.cards_used, COUNT(c.id) AS actual_cards
+FROM users u
+LEFT JOIN preference_cards c ON c.user_id = u.id AND c.is_template = FALSE
+GROUP BY u.id, u.cards_used
+HAVING u.cards_used <> COUNT(c.id);
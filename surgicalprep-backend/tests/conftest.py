@@ -2,83 +2,178 @@
 Pytest configuration and shared fixtures for backend tests.
 """
 import asyncio
-from datetime import datetime, timedelta
-from typing import AsyncGenerator, Generator
+import os
+from datetime import datetime, timedelta, timezone
+from typing import AsyncGenerator
 from uuid import uuid4
 
+import orjson
 import pytest
 import pytest_asyncio
-from httpx import AsyncClient, ASGITransport
-from sqlalchemy import create_engine, event
+from httpx import AsyncClient, ASGITransport, Response
+from sqlalchemy import event, insert
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
 from app.db.database import Base, get_db
-from app.db.models import User, Instrument, PreferenceCard, CardItem, QuizSession, UserInstrumentProgress
-from app.core.security import get_password_hash, create_access_token
-from app.core.config import settings
-
-
-# Test database URL - use SQLite for tests
-TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+from app.db.models import User, Instrument, PreferenceCard, QuizSession, UserInstrumentProgress
+from app.core.security import get_password_hash, create_access_token, pwd_context
+
+
+# Test database URL - SQLite in memory by default. Set TEST_DATABASE_URL to
+# a postgresql+asyncpg URL to run against Postgres; each pytest-xdist worker
+# then gets its own schema so parallel runs never share rows.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+# Placeholder Stripe settings so the subscription service imports without a
+# .env; the webhook tests stub out every call that would reach Stripe
+for name in (
+    "STRIPE_SECRET_KEY",
+    "STRIPE_PUBLISHABLE_KEY",
+    "STRIPE_WEBHOOK_SECRET",
+    "STRIPE_MONTHLY_PRICE_ID",
+    "STRIPE_ANNUAL_PRICE_ID",
+):
+    os.environ.setdefault(name, f"{name.lower()}_placeholder")
+
+# Empties every table in one statement on a persistent (Postgres) test
+# database, which is much cheaper than dropping and recreating the schema
+TRUNCATE_ALL_TABLES = "TRUNCATE {} RESTART IDENTITY CASCADE".format(
+    ", ".join(f'"{table.name}"' for table in Base.metadata.sorted_tables)
+)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
+    """Use the minimum bcrypt cost so seeding and login tests skip the slow hash."""
+    original = pwd_context.to_dict()
+    pwd_context.update(bcrypt__rounds=4)
+    yield
+    pwd_context.load(original)
 
 
 @pytest.fixture(scope="session")
-def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
-
-@pytest_asyncio.fixture(scope="function")
-async def test_engine():
-    """Create a test database engine."""
-    engine = create_async_engine(
-        TEST_DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        echo=False,
-    )
+def event_loop_policy():
+    """Run the session's event loop on uvloop where it is installed."""
+    # uvicorn[standard] brings uvloop in on Linux/macOS; it has no Windows build
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def orjson_response_parsing():
+    """Parse response bodies with orjson, matching the app's ORJSONResponse encoder."""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(Response, "json", lambda self, **kwargs: orjson.loads(self.content))
+        yield
+
+
+@pytest_asyncio.fixture(scope="session")
+async def test_engine(worker_id: str):
+    """Create the test database engine and schema once per test session."""
+    if TEST_DATABASE_URL.startswith("sqlite"):
+        # Every xdist worker is its own process with its own in-memory database
+        engine = create_async_engine(
+            TEST_DATABASE_URL,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+            echo=False,
+        )
+        
+        # pysqlite's own transaction handling breaks SAVEPOINT; let SQLAlchemy
+        # emit BEGIN itself so per-test rollbacks work.
+        @event.listens_for(engine.sync_engine, "connect")
+        def do_connect(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+        
+        @event.listens_for(engine.sync_engine, "begin")
+        def do_begin(conn):
+            conn.exec_driver_sql("BEGIN")
+    else:
+        schema = f"test_{worker_id}"
+        admin_engine = create_async_engine(TEST_DATABASE_URL)
+        async with admin_engine.begin() as conn:
+            await conn.exec_driver_sql(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+        await admin_engine.dispose()
+        
+        engine = create_async_engine(
+            TEST_DATABASE_URL,
+            connect_args={"server_settings": {"search_path": schema}},
+            echo=False,
+        )
     
+    # create_all skips tables that already exist, so a worker schema left by
+    # an earlier Postgres run is reused as-is; drop the schema after a
+    # model change to rebuild it.
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        if not TEST_DATABASE_URL.startswith("sqlite"):
+            # Clear anything an interrupted run left behind
+            await conn.exec_driver_sql(TRUNCATE_ALL_TABLES)
     
     yield engine
     
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+        if TEST_DATABASE_URL.startswith("sqlite"):
+            await conn.run_sync(Base.metadata.drop_all)
+        else:
+            await conn.exec_driver_sql(TRUNCATE_ALL_TABLES)
     
     await engine.dispose()
 
 
-@pytest_asyncio.fixture(scope="function")
-async def test_db(test_engine) -> AsyncGenerator[AsyncSession, None]:
-    """Create a test database session."""
-    async_session_maker = async_sessionmaker(
+@pytest_asyncio.fixture(scope="session")
+async def seed_db(test_engine) -> async_sessionmaker[AsyncSession]:
+    """Session factory for data seeded once and shared by every test."""
+    return async_sessionmaker(
         test_engine,
         class_=AsyncSession,
         expire_on_commit=False,
         autocommit=False,
         autoflush=False,
     )
-    
-    async with async_session_maker() as session:
-        yield session
-        await session.rollback()
 
 
 @pytest_asyncio.fixture(scope="function")
-async def async_client(test_db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
-    """Create an async HTTP client for testing."""
+async def test_db(test_engine) -> AsyncGenerator[AsyncSession, None]:
+    """Create a test database session whose writes are rolled back after the test."""
+    async with test_engine.connect() as conn:
+        transaction = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            autoflush=False,
+            join_transaction_mode="create_savepoint",
+        )
+        
+        yield session
+        
+        await session.close()
+        await transaction.rollback()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def shared_client(seed_db: async_sessionmaker[AsyncSession]) -> AsyncGenerator[AsyncClient, None]:
+    """Create one async HTTP client that is reused by every test."""
+    # Outside a test's async_client, requests (e.g. from module-scoped
+    # fixtures) hit the seeded data and commit like the real get_db. The
+    # in-memory database is a single connection, so they take turns.
+    seed_lock = asyncio.Lock()
     
     async def override_get_db():
-        yield test_db
+        async with seed_lock, seed_db() as session:
+            yield session
+            await session.commit()
     
     app.dependency_overrides[get_db] = override_get_db
     
+    # ASGITransport calls the app in-process, so there is no TCP/TLS
+    # connection (and no HTTP/2) to keep alive; sharing the client still
+    # saves building a transport and client per test.
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
         yield client
@@ -86,63 +181,105 @@ async def async_client(test_db: AsyncSession) -> AsyncGenerator[AsyncClient, Non
     app.dependency_overrides.clear()
 
 
+@pytest_asyncio.fixture(scope="function")
+async def async_client(shared_client: AsyncClient, test_db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+    """Point the shared HTTP client at this test's database session."""
+    # An AsyncSession cannot run concurrent operations, so requests a test
+    # fires with asyncio.gather take turns on it.
+    session_lock = asyncio.Lock()
+    
+    async def override_get_db():
+        async with session_lock:
+            yield test_db
+    
+    seed_override = app.dependency_overrides[get_db]
+    app.dependency_overrides[get_db] = override_get_db
+    
+    yield shared_client
+    
+    app.dependency_overrides[get_db] = seed_override
+
+
 # =============================================================================
 # User Fixtures
 # =============================================================================
 
-@pytest_asyncio.fixture
-async def test_user(test_db: AsyncSession) -> User:
-    """Create a test user."""
+# Passwords hashed once per session and shared by every user fixture
+SEEDED_PASSWORDS = ["TestPassword123!", "PremiumPassword123!", "InactivePassword123!"]
+
+
+@pytest_asyncio.fixture(scope="session")
+async def seeded_password_hashes() -> dict[str, str]:
+    """Hash the fixture users' passwords concurrently, keyed by password."""
+    # bcrypt releases the GIL, so worker threads hash in parallel instead
+    # of each seeded user paying for its hash in turn.
+    hashes = await asyncio.gather(*[
+        asyncio.to_thread(get_password_hash, password)
+        for password in SEEDED_PASSWORDS
+    ])
+    return dict(zip(SEEDED_PASSWORDS, hashes))
+
+
+@pytest_asyncio.fixture(scope="session")
+async def seeded_test_user(
+    seed_db: async_sessionmaker[AsyncSession], seeded_password_hashes: dict[str, str]
+) -> User:
+    """Create the free test user once per test session."""
     user = User(
-        id=uuid4(),
         email="testuser@example.com",
-        hashed_password=get_password_hash("TestPassword123!"),
+        password_hash=seeded_password_hashes["TestPassword123!"],
         full_name="Test User",
         role="surgical_tech",
         institution="Test Hospital",
-        is_premium=False,
-        is_active=True,
-        created_at=datetime.utcnow(),
+        subscription_tier="free",
     )
-    test_db.add(user)
-    await test_db.commit()
-    await test_db.refresh(user)
+    async with seed_db() as session:
+        session.add(user)
+        await session.commit()
     return user
 
 
-@pytest_asyncio.fixture
-async def premium_user(test_db: AsyncSession) -> User:
-    """Create a premium test user."""
+@pytest_asyncio.fixture(scope="session")
+async def seeded_premium_user(
+    seed_db: async_sessionmaker[AsyncSession], seeded_password_hashes: dict[str, str]
+) -> User:
+    """Create the premium test user once per test session."""
     user = User(
-        id=uuid4(),
         email="premium@example.com",
-        hashed_password=get_password_hash("PremiumPassword123!"),
+        password_hash=seeded_password_hashes["PremiumPassword123!"],
         full_name="Premium User",
         role="surgical_tech",
         institution="Premium Hospital",
-        is_premium=True,
-        premium_until=datetime.utcnow() + timedelta(days=30),
-        is_active=True,
-        created_at=datetime.utcnow(),
+        subscription_tier="premium",
+        subscription_expires_at=datetime.now(timezone.utc) + timedelta(days=30),
     )
-    test_db.add(user)
-    await test_db.commit()
-    await test_db.refresh(user)
+    async with seed_db() as session:
+        session.add(user)
+        await session.commit()
     return user
 
 
 @pytest_asyncio.fixture
-async def inactive_user(test_db: AsyncSession) -> User:
+async def test_user(test_db: AsyncSession, seeded_test_user: User) -> User:
+    """Load the test user into this test's session so changes roll back."""
+    return await test_db.get(User, seeded_test_user.id)
+
+
+@pytest_asyncio.fixture
+async def premium_user(test_db: AsyncSession, seeded_premium_user: User) -> User:
+    """Load the premium test user into this test's session so changes roll back."""
+    return await test_db.get(User, seeded_premium_user.id)
+
+
+@pytest_asyncio.fixture
+async def inactive_user(test_db: AsyncSession, seeded_password_hashes: dict[str, str]) -> User:
     """Create an inactive test user."""
     user = User(
-        id=uuid4(),
         email="inactive@example.com",
-        hashed_password=get_password_hash("InactivePassword123!"),
+        password_hash=seeded_password_hashes["InactivePassword123!"],
         full_name="Inactive User",
         role="student",
-        is_premium=False,
-        is_active=False,
-        created_at=datetime.utcnow(),
+        subscription_tier="free",
     )
     test_db.add(user)
     await test_db.commit()
@@ -150,30 +287,69 @@ async def inactive_user(test_db: AsyncSession) -> User:
     return user
 
 
-@pytest.fixture
-def auth_headers(test_user: User) -> dict:
+@pytest_asyncio.fixture
+async def disposable_user(test_db: AsyncSession, seeded_password_hashes: dict[str, str]) -> User:
+    """Create a throwaway user for tests that delete or re-identify their user."""
+    # A plain INSERT with the session's cached hash; nothing is re-hashed
+    return await test_db.scalar(
+        insert(User)
+        .values(
+            email="disposable@example.com",
+            password_hash=seeded_password_hashes["TestPassword123!"],
+            full_name="Disposable User",
+            role="student",
+        )
+        .returning(User)
+    )
+
+
+# Tokens are signed once per session, so they must outlive the default
+# 30-minute expiry on a long run
+SESSION_TOKEN_TTL = timedelta(hours=2)
+
+
+@pytest.fixture(scope="session")
+def auth_headers(seeded_test_user: User) -> dict:
     """Create authentication headers for the test user."""
-    token = create_access_token(subject=str(test_user.id))
+    token = create_access_token({"sub": str(seeded_test_user.id)}, expires_delta=SESSION_TOKEN_TTL)
     return {"Authorization": f"Bearer {token}"}
 
 
-@pytest.fixture
-def premium_auth_headers(premium_user: User) -> dict:
+@pytest.fixture(scope="session")
+def premium_auth_headers(seeded_premium_user: User) -> dict:
     """Create authentication headers for the premium user."""
-    token = create_access_token(subject=str(premium_user.id))
+    token = create_access_token({"sub": str(seeded_premium_user.id)}, expires_delta=SESSION_TOKEN_TTL)
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def disposable_auth_headers(disposable_user: User) -> dict:
+    """Create authentication headers for the disposable user."""
+    token = create_access_token({"sub": str(disposable_user.id)})
     return {"Authorization": f"Bearer {token}"}
 
 
+@pytest.fixture(scope="session")
+def json_auth_headers(auth_headers: dict) -> dict:
+    """Test user headers for requests that send a pre-serialized JSON body."""
+    return {**auth_headers, "Content-Type": "application/json"}
+
+
+@pytest.fixture(scope="session")
+def json_premium_auth_headers(premium_auth_headers: dict) -> dict:
+    """Premium user headers for requests that send a pre-serialized JSON body."""
+    return {**premium_auth_headers, "Content-Type": "application/json"}
+
+
 # =============================================================================
 # Instrument Fixtures
 # =============================================================================
 
-@pytest_asyncio.fixture
-async def sample_instruments(test_db: AsyncSession) -> list[Instrument]:
-    """Create sample instruments for testing."""
+@pytest_asyncio.fixture(scope="session")
+async def sample_instruments(seed_db: async_sessionmaker[AsyncSession]) -> list[Instrument]:
+    """Create sample instruments once per test session (read-only in tests)."""
     instruments = [
         Instrument(
-            id=uuid4(),
             name="Mayo Scissors",
             aliases=["Mayo Dissecting Scissors"],
             category="cutting",
@@ -186,7 +362,6 @@ async def sample_instruments(test_db: AsyncSession) -> list[Instrument]:
             created_at=datetime.utcnow(),
         ),
         Instrument(
-            id=uuid4(),
             name="Kelly Forceps",
             aliases=["Kelly Clamp", "Kelly Hemostat"],
             category="clamping",
@@ -199,7 +374,6 @@ async def sample_instruments(test_db: AsyncSession) -> list[Instrument]:
             created_at=datetime.utcnow(),
         ),
         Instrument(
-            id=uuid4(),
             name="Debakey Forceps",
             aliases=["DeBakey Tissue Forceps"],
             category="grasping",
@@ -212,7 +386,6 @@ async def sample_instruments(test_db: AsyncSession) -> list[Instrument]:
             created_at=datetime.utcnow(),
         ),
         Instrument(
-            id=uuid4(),
             name="Metzenbaum Scissors",
             aliases=["Metz Scissors", "Metz"],
             category="cutting",
@@ -225,7 +398,6 @@ async def sample_instruments(test_db: AsyncSession) -> list[Instrument]:
             created_at=datetime.utcnow(),
         ),
         Instrument(
-            id=uuid4(),
             name="Army-Navy Retractor",
             aliases=["US Army Retractor"],
             category="retraction",
@@ -239,22 +411,23 @@ async def sample_instruments(test_db: AsyncSession) -> list[Instrument]:
         ),
     ]
     
-    for instrument in instruments:
-        test_db.add(instrument)
-    
-    await test_db.commit()
-    
-    for instrument in instruments:
-        await test_db.refresh(instrument)
+    async with seed_db() as session:
+        session.add_all(instruments)
+        await session.commit()
     
     return instruments
 
 
+@pytest.fixture(scope="session")
+def premium_instrument(sample_instruments: list[Instrument]) -> Instrument:
+    """The premium entry in sample_instruments."""
+    return next(i for i in sample_instruments if i.is_premium)
+
+
 @pytest_asyncio.fixture
 async def single_instrument(test_db: AsyncSession) -> Instrument:
     """Create a single instrument for testing."""
     instrument = Instrument(
-        id=uuid4(),
         name="Test Scalpel",
         aliases=["Surgical Knife"],
         category="cutting",
@@ -280,7 +453,6 @@ async def single_instrument(test_db: AsyncSession) -> Instrument:
 async def sample_card(test_db: AsyncSession, test_user: User, sample_instruments: list[Instrument]) -> PreferenceCard:
     """Create a sample preference card with items."""
     card = PreferenceCard(
-        id=uuid4(),
         user_id=test_user.id,
         title="Laparoscopic Cholecystectomy",
         surgeon_name="Dr. Smith",
@@ -288,54 +460,50 @@ async def sample_card(test_db: AsyncSession, test_user: User, sample_instruments
         specialty="general",
         general_notes="Standard setup for lap chole.",
         setup_notes="Prepare laparoscopic tower first.",
+        # Items live in the card's JSON column, shaped like schemas.card.CardItem
+        items=[
+            {
+                "id": str(uuid4()),
+                "name": sample_instruments[0].name,
+                "category": "instruments",
+                "quantity": 2,
+                "size": "Medium",
+                "notes": "Curved preferred",
+                "instrument_id": sample_instruments[0].id,
+                "is_custom": False,
+                "sort_order": 0,
+            },
+            {
+                "id": str(uuid4()),
+                "name": sample_instruments[1].name,
+                "category": "instruments",
+                "quantity": 4,
+                "size": "Large",
+                "notes": None,
+                "instrument_id": sample_instruments[1].id,
+                "is_custom": False,
+                "sort_order": 1,
+            },
+            {
+                "id": str(uuid4()),
+                "name": "10-blade scalpel",
+                "category": "supplies",
+                "quantity": 2,
+                "size": None,
+                "notes": "Have backup available",
+                "instrument_id": None,
+                "is_custom": True,
+                "sort_order": 2,
+            },
+        ],
         is_template=False,
         is_public=False,
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
     )
     test_db.add(card)
-    await test_db.flush()
-    
-    # Add items to the card
-    items = [
-        CardItem(
-            id=uuid4(),
-            card_id=card.id,
-            instrument_id=sample_instruments[0].id,
-            custom_name=None,
-            quantity=2,
-            size="Medium",
-            notes="Curved preferred",
-            category="instruments",
-            sort_order=0,
-        ),
-        CardItem(
-            id=uuid4(),
-            card_id=card.id,
-            instrument_id=sample_instruments[1].id,
-            custom_name=None,
-            quantity=4,
-            size="Large",
-            notes=None,
-            category="instruments",
-            sort_order=1,
-        ),
-        CardItem(
-            id=uuid4(),
-            card_id=card.id,
-            instrument_id=None,
-            custom_name="10-blade scalpel",
-            quantity=2,
-            size=None,
-            notes="Have backup available",
-            category="supplies",
-            sort_order=2,
-        ),
-    ]
-    
-    for item in items:
-        test_db.add(item)
     
+    test_user.cards_used += 1
     await test_db.commit()
     await test_db.refresh(card)
     return card
@@ -345,7 +513,6 @@ async def sample_card(test_db: AsyncSession, test_user: User, sample_instruments
 async def template_card(test_db: AsyncSession, sample_instruments: list[Instrument]) -> PreferenceCard:
     """Create a template preference card."""
     card = PreferenceCard(
-        id=uuid4(),
         user_id=None,  # Templates have no user
         title="General Surgery Template",
         surgeon_name=None,
@@ -370,7 +537,6 @@ async def user_cards(test_db: AsyncSession, test_user: User) -> list[PreferenceC
     cards = []
     for i in range(5):
         card = PreferenceCard(
-            id=uuid4(),
             user_id=test_user.id,
             title=f"Test Card {i + 1}",
             surgeon_name=f"Dr. Test {i + 1}",
@@ -384,6 +550,7 @@ async def user_cards(test_db: AsyncSession, test_user: User) -> list[PreferenceC
         test_db.add(card)
         cards.append(card)
     
+    test_user.cards_used += len(cards)
     await test_db.commit()
     for card in cards:
         await test_db.refresh(card)
@@ -398,15 +565,13 @@ async def user_cards(test_db: AsyncSession, test_user: User) -> list[PreferenceC
 async def quiz_session(test_db: AsyncSession, test_user: User) -> QuizSession:
     """Create a quiz session."""
     session = QuizSession(
-        id=uuid4(),
         user_id=test_user.id,
         quiz_type="multiple_choice",
-        category=None,
-        total_questions=10,
-        correct_answers=0,
-        completed=False,
-        started_at=datetime.utcnow(),
-        completed_at=None,
+        category_filter=None,
+        question_count=10,
+        status="in_progress",
+        questions=[],
+        answers=[],
     )
     test_db.add(session)
     await test_db.commit()
@@ -414,23 +579,28 @@ async def quiz_session(test_db: AsyncSession, test_user: User) -> QuizSession:
     return session
 
 
-@pytest_asyncio.fixture
-async def completed_quiz_session(test_db: AsyncSession, test_user: User) -> QuizSession:
-    """Create a completed quiz session."""
+@pytest_asyncio.fixture(scope="session")
+async def completed_quiz_session(seed_db: async_sessionmaker[AsyncSession], seeded_test_user: User) -> QuizSession:
+    """Create a completed quiz session once per test session."""
+    # Backdated a day so it never counts toward today's free-tier quizzes;
+    # tests that write to it go through test_db and are rolled back.
+    started_at = datetime.utcnow() - timedelta(days=1)
     session = QuizSession(
-        id=uuid4(),
-        user_id=test_user.id,
+        user_id=seeded_test_user.id,
         quiz_type="flashcard",
-        category="cutting",
+        category_filter="cutting",
+        question_count=10,
         total_questions=10,
-        correct_answers=8,
-        completed=True,
-        started_at=datetime.utcnow() - timedelta(minutes=10),
-        completed_at=datetime.utcnow(),
+        score=8,
+        status="completed",
+        questions=[],
+        answers=[],
+        started_at=started_at,
+        completed_at=started_at + timedelta(minutes=10),
     )
-    test_db.add(session)
-    await test_db.commit()
-    await test_db.refresh(session)
+    async with seed_db() as db:
+        db.add(session)
+        await db.commit()
     return session
 
 
@@ -441,27 +611,28 @@ async def completed_quiz_session(test_db: AsyncSession, test_user: User) -> Quiz
 @pytest_asyncio.fixture
 async def user_progress(test_db: AsyncSession, test_user: User, sample_instruments: list[Instrument]) -> list[UserInstrumentProgress]:
     """Create study progress entries for a user."""
-    progress_entries = []
-    
-    for i, instrument in enumerate(sample_instruments[:3]):
-        progress = UserInstrumentProgress(
-            id=uuid4(),
-            user_id=test_user.id,
-            instrument_id=instrument.id,
-            times_studied=i + 1,
-            times_correct=i,
-            last_studied=datetime.utcnow() - timedelta(days=i),
-            next_review=datetime.utcnow() + timedelta(days=i),
-            ease_factor=2.5,
-            interval=i + 1,
-            is_bookmarked=i == 0,  # First instrument is bookmarked
-        )
-        test_db.add(progress)
-        progress_entries.append(progress)
+    rows = [
+        {
+            "user_id": test_user.id,
+            "instrument_id": instrument.id,
+            "times_studied": i + 1,
+            "times_correct": i,
+            "last_studied_at": datetime.utcnow() - timedelta(days=i),
+            "next_review_at": datetime.utcnow() + timedelta(days=i),
+            "ease_factor": 2.5,
+            "interval_days": i + 1,
+            "is_bookmarked": i == 0,  # First instrument is bookmarked
+        }
+        for i, instrument in enumerate(sample_instruments[:3])
+    ]
     
-    await test_db.commit()
-    for progress in progress_entries:
-        await test_db.refresh(progress)
+    # ORM bulk insert: one multi-row INSERT ... RETURNING (insertmanyvalues)
+    # instead of a unit-of-work flush per object
+    result = await test_db.scalars(
+        insert(UserInstrumentProgress).returning(UserInstrumentProgress),
+        rows,
+    )
+    progress_entries = list(result)
     
     return progress_entries
 
@@ -478,7 +649,7 @@ def create_test_token(user_id: str, expired: bool = False) -> str:
     else:
         expires_delta = timedelta(minutes=30)
     
-    return create_access_token(subject=user_id, expires_delta=expires_delta)
+    return create_access_token({"sub": user_id}, expires_delta=expires_delta)
 
 
 # =============================================================================
@@ -490,3 +661,11 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "slow: marks tests as slow (deselect with '-m \"not slow\"')")
     config.addinivalue_line("markers", "integration: marks tests as integration tests")
     config.addinivalue_line("markers", "unit: marks tests as unit tests")
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on the session event loop shared with session fixtures."""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if pytest_asyncio.is_async_test(item):
+            item.add_marker(session_loop, append=False)
@@ -0,0 +1,24 @@
+"""
+Response shapes asserted by the endpoint tests.
+
+Validating a response against one of these models checks every field in a
+single pass and reports all mismatches at once, instead of a string of
+`assert "field" in data` checks that stop at the first miss.
+"""
+from typing import List
+
+from pydantic import Field
+
+from app.schemas import QuizQuestion, QuizSessionStart
+
+
+# =============================================================================
+# Quiz Responses
+# =============================================================================
+
+class MultipleChoiceQuestionResponse(QuizQuestion):
+    options: List[str] = Field(..., min_length=4)
+
+
+class MultipleChoiceStartResponse(QuizSessionStart):
+    questions: List[MultipleChoiceQuestionResponse]
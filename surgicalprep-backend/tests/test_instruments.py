@@ -191,12 +191,9 @@ class TestPremiumInstrumentContent:
     
     @pytest.mark.asyncio
     async def test_free_user_sees_limited_premium_content(
-        self, async_client: AsyncClient, auth_headers: dict, sample_instruments: list[Instrument]
+        self, async_client: AsyncClient, auth_headers: dict, premium_instrument: Instrument
     ):
         """Test free user sees limited info for premium instruments."""
-        # Find a premium instrument
-        premium_instrument = next(i for i in sample_instruments if i.is_premium)
-        
         response = await async_client.get(
             f"/api/v1/instruments/{premium_instrument.id}",
             headers=auth_headers,
@@ -205,16 +202,13 @@ class TestPremiumInstrumentContent:
         assert response.status_code == 200
         data = response.json()
         # Premium content should be gated
-        assert data.get("is_premium_locked", False) or "premium" in str(data).lower()
+        assert data.get("is_premium_locked", False) is True or data.get("handling_notes") is None
     
     @pytest.mark.asyncio
     async def test_premium_user_sees_full_content(
-        self, async_client: AsyncClient, premium_auth_headers: dict, sample_instruments: list[Instrument]
+        self, async_client: AsyncClient, premium_auth_headers: dict, premium_instrument: Instrument
     ):
         """Test premium user sees full instrument details."""
-        # Find a premium instrument
-        premium_instrument = next(i for i in sample_instruments if i.is_premium)
-        
         response = await async_client.get(
             f"/api/v1/instruments/{premium_instrument.id}",
             headers=premium_auth_headers,
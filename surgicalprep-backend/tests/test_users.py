@@ -97,11 +97,11 @@ class TestUpdateUser:
         assert data["institution"] == original_institution
     
     @pytest.mark.asyncio
-    async def test_update_profile_email_change(self, async_client: AsyncClient, auth_headers: dict):
+    async def test_update_profile_email_change(self, async_client: AsyncClient, disposable_auth_headers: dict):
         """Test email change (if allowed)."""
         response = await async_client.patch(
             "/api/v1/users/me",
-            headers=auth_headers,
+            headers=disposable_auth_headers,
             json={
                 "email": "newemail@example.com",
             },
@@ -190,11 +190,11 @@ class TestDeleteAccount:
     """Tests for account deletion."""
     
     @pytest.mark.asyncio
-    async def test_delete_account_success(self, async_client: AsyncClient, auth_headers: dict):
+    async def test_delete_account_success(self, async_client: AsyncClient, disposable_auth_headers: dict):
         """Test successful account deletion."""
         response = await async_client.delete(
             "/api/v1/users/me",
-            headers=auth_headers,
+            headers=disposable_auth_headers,
             json={"confirm": True},
         )
         